@@ -13,6 +13,9 @@ Usage:
     python generate_image.py icon-sheet
     python generate_image.py interview-banner --mode bot-human
 
+    # Several templates at once (submitted and polled concurrently)
+    python generate_image.py --batch hero-banner,og-card,twitter-card
+
     # Custom prompt (art direction style applied automatically)
     python generate_image.py custom --prompt "your custom prompt here" --ar 16:9
 
@@ -33,27 +36,51 @@ Environment:
     APIFRAME_API_KEY: Your APIframe API key (required)
 """
 
+from __future__ import annotations
+
 import argparse
+import functools
+import hashlib
 import json
 import os
+import random
+import re
+import shutil
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import Optional
-from urllib.request import urlretrieve
-
-import requests
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Optional
 
-# Load environment variables
-load_dotenv()
+# requests, dotenv, asyncio, http.server and concurrent.futures are imported
+# where they are used so that --list and --help don't pay for loading them
+if TYPE_CHECKING:
+    import requests
 
-APIFRAME_API_KEY = os.getenv("APIFRAME_API_KEY")
 APIFRAME_BASE_URL = "https://api.apiframe.pro"
 
+# Status codes worth retrying (rate limiting and transient server errors)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Statuses that mean the server did not accept the request, so a
+# non-idempotent call (billed /imagine submits) can be safely resent
+RESUBMITTABLE_STATUS_CODES = {429, 503}
+
 # Output directory for downloaded images (relative to current working directory)
 OUTPUT_DIR = Path.cwd() / "generated-assets"
 
+# Read size for image downloads, on the order of a socket receive window
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+
+# Content-addressed image cache: files live at CACHE_DIR/<key>.png and the
+# index maps image URL -> [cache key, size]
+CACHE_DIR = OUTPUT_DIR / ".cache"
+CACHE_INDEX = CACHE_DIR / "index.json"
+
+# Tasks submitted with --webhook that are awaiting delivery, one JSON file
+# per task so a --serve process and concurrent submits never share a file
+PENDING_DIR = OUTPUT_DIR / ".pending"
+
 
 # =============================================================================
 # ART DIRECTION TEMPLATES
@@ -69,6 +96,9 @@ atmospheric depth, layered elements
 
 STYLE_SUFFIX = "--style raw --no people faces text"
 
+# Detects prompts that already carry a Midjourney style flag
+_STYLE_FLAG_RE = re.compile(r"--style\b", re.IGNORECASE)
+
 TEMPLATES = {
     "hero-banner": {
         "description": "Landing page hero banner (2560x1440)",
@@ -178,33 +208,226 @@ premium texture overlay --style raw --no text objects
 }
 
 
+def normalize_prompt(prompt: str) -> str:
+    """Collapse all whitespace (including newlines) into single spaces."""
+    return " ".join(prompt.split())
+
+
+# A normalized prompt split around its [FEATURE] placeholder: (prefix, suffix),
+# with suffix None when the prompt has no placeholder
+PromptParts = tuple[str, Optional[str]]
+
+
+def _split_prompt(prompt: str) -> PromptParts:
+    """Normalize a template prompt and split it at the [FEATURE] placeholder."""
+    prefix, placeholder, suffix = normalize_prompt(prompt).partition("[FEATURE]")
+    return (prefix, suffix) if placeholder else (prefix, None)
+
+
+def _build_template_index() -> dict[
+    str,
+    tuple[
+        str,
+        tuple[str, ...],
+        Optional[dict[str, PromptParts]],
+        Optional[PromptParts],
+    ],
+]:
+    """Flatten TEMPLATES into name -> (aspect_ratio, requires, variants, prompt)."""
+    index = {}
+    for name, template in TEMPLATES.items():
+        variants = template.get("variants")
+        index[name] = (
+            template["aspect_ratio"],
+            tuple(template.get("requires", ())),
+            (
+                {mode: _split_prompt(text) for mode, text in variants.items()}
+                if variants
+                else None
+            ),
+            _split_prompt(template["prompt"]) if "prompt" in template else None,
+        )
+    return index
+
+
+# Built once at import so build_prompt is a single lookup per call
+_TEMPLATE_INDEX = _build_template_index()
+
+
+_ENV_LOADED = False
+
+
+def _load_env_once():
+    """Load environment variables from .env on first use."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _ENV_LOADED = True
+
+
 def get_headers() -> dict:
     """Get API request headers."""
-    if not APIFRAME_API_KEY:
+    _load_env_once()
+    api_key = os.getenv("APIFRAME_API_KEY")
+
+    if not api_key:
         print("Error: APIFRAME_API_KEY not set in environment")
         print("Add it to your .env file: APIFRAME_API_KEY=your_key_here")
         sys.exit(1)
 
     return {
         "Content-Type": "application/json",
-        "Authorization": APIFRAME_API_KEY,
+        "Authorization": api_key,
     }
 
 
-def submit_imagine(prompt: str, aspect_ratio: str = "1:1") -> str:
+# (connect, read) timeout for API calls so a stuck connection cannot hang polling
+API_TIMEOUT = (5, 30)
+
+_SESSION = None
+
+
+def _get_session() -> requests.Session:
+    """Return the shared keep-alive session so polling reuses one connection.
+
+    Retries are handled by _request_with_retry, not urllib3.
+    """
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _SESSION = requests.Session()
+        _SESSION.mount(
+            "https://",
+            HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0),
+        )
+    return _SESSION
+
+
+def _retry_delay(
+    retry_after: Optional[str],
+    attempt: int,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.5,
+) -> float:
+    """Compute the sleep before the next attempt, honoring Retry-After."""
+    if retry_after:
+        try:
+            return min(max_delay, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP-date form, fall back to exponential backoff
+
+    delay = min(max_delay, base_delay * 2**attempt)
+    return delay * (1 + random.random() * jitter)
+
+
+def _failed_to_connect(error: Exception) -> bool:
+    """Whether a requests error happened before the request could be sent."""
+    import requests
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+
+    # Resets and RemoteDisconnected after sending also surface as
+    # ConnectionError, but wrap a ProtocolError rather than this chain
+    reason = error.args[0] if error.args else None
+    return isinstance(reason, MaxRetryError) and isinstance(
+        reason.reason, NewConnectionError
+    )
+
+
+def _request_with_retry(
+    method: str,
+    url: str,
+    *,
+    json: dict,
+    headers: dict,
+    max_retries: int = 3,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: float = 0.5,
+    timeout: tuple[float, float] = API_TIMEOUT,
+    idempotent: bool = True,
+) -> requests.Response:
+    """Send a request, retrying transient failures with exponential backoff.
+
+    Connection errors, timeouts and retryable status codes are retried up to
+    ``max_retries`` times. Any other response (including 4xx other than 429)
+    is returned immediately for the caller to handle.
+
+    With ``idempotent=False`` only failures where the server cannot have
+    accepted the request are retried: failing to connect and 429/503.
+    Connection resets, read timeouts and other 5xx may follow an accepted
+    job and are not resent.
+    """
+    import requests
+
+    session = _get_session()
+    if idempotent:
+        retryable_codes = RETRYABLE_STATUS_CODES
+    else:
+        retryable_codes = RESUBMITTABLE_STATUS_CODES
+
+    for attempt in range(max_retries):
+        last_attempt = attempt == max_retries - 1
+        response = None
+
+        try:
+            response = session.request(
+                method, url, json=json, headers=headers, timeout=timeout
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt or not (idempotent or _failed_to_connect(e)):
+                raise
+            print(f"\n  Request failed ({e.__class__.__name__}), retrying...")
+        else:
+            if response.status_code not in retryable_codes or last_attempt:
+                return response
+            print(f"\n  API returned status {response.status_code}, retrying...")
+
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        time.sleep(_retry_delay(retry_after, attempt, base_delay, max_delay, jitter))
+
+    raise ValueError("max_retries must be at least 1")
+
+
+def submit_imagine(
+    prompt: str, aspect_ratio: str = "1:1", webhook_url: Optional[str] = None
+) -> str:
     """Submit an imagine request and return the task_id."""
+    import requests
+
     url = f"{APIFRAME_BASE_URL}/imagine"
 
+    # Template prompts arrive pre-normalized; only multiline input needs work
+    if "\n" in prompt or prompt != prompt.strip():
+        prompt = normalize_prompt(prompt)
+
     payload = {
-        "prompt": prompt.strip().replace("\n", " "),
+        "prompt": prompt,
         "aspect_ratio": aspect_ratio,
     }
+    if webhook_url:
+        payload["webhook_url"] = webhook_url
 
     print(f"\nSubmitting prompt to Midjourney...")
     print(f"Aspect ratio: {aspect_ratio}")
     print(f"Prompt: {payload['prompt'][:100]}...")
 
-    response = requests.post(url, headers=get_headers(), json=payload)
+    try:
+        response = _request_with_retry(
+            "POST", url, headers=get_headers(), json=payload, idempotent=False
+        )
+    except requests.RequestException as e:
+        print(f"Error: Request to APIframe failed: {e}")
+        sys.exit(1)
 
     if response.status_code != 200:
         print(f"Error: API returned status {response.status_code}")
@@ -224,10 +447,17 @@ def submit_imagine(prompt: str, aspect_ratio: str = "1:1") -> str:
 
 def fetch_result(task_id: str) -> dict:
     """Fetch the result of a task."""
+    import requests
+
     url = f"{APIFRAME_BASE_URL}/fetch"
     payload = {"task_id": task_id}
 
-    response = requests.post(url, headers=get_headers(), json=payload)
+    try:
+        response = _request_with_retry(
+            "POST", url, headers=get_headers(), json=payload
+        )
+    except requests.RequestException as e:
+        return {"status": "error", "message": str(e)}
 
     if response.status_code != 200:
         return {"status": "error", "message": response.text}
@@ -235,11 +465,32 @@ def fetch_result(task_id: str) -> dict:
     return response.json()
 
 
+def poll_interval(
+    n: int,
+    percentage,
+    initial: float = 2.0,
+    growth: float = 1.5,
+    max_interval: float = 10.0,
+) -> float:
+    """Return the delay before poll ``n``, shortened near completion."""
+    try:
+        if float(percentage) >= 90:
+            return initial
+    except (TypeError, ValueError):
+        pass
+
+    return min(max_interval, initial * growth**n)
+
+
 def poll_for_completion(
-    task_id: str, timeout: int = 300, interval: int = 5
+    task_id: str,
+    timeout: int = 300,
+    initial_interval: float = 2.0,
+    max_interval: float = 10.0,
 ) -> Optional[dict]:
-    """Poll for task completion with timeout."""
+    """Poll for task completion with timeout, backing off between polls."""
     start_time = time.time()
+    n = 0
 
     print(f"\nWaiting for generation to complete...")
 
@@ -258,16 +509,105 @@ def poll_for_completion(
 
         # Show progress
         print(f"  Status: {status} ({percentage}%)", end="\r")
-        time.sleep(interval)
+        remaining = timeout - (time.time() - start_time)
+        delay = poll_interval(
+            n, percentage, initial=initial_interval, max_interval=max_interval
+        )
+        time.sleep(max(0.0, min(delay, remaining)))
+        n += 1
 
     print(f"\nTimeout after {timeout} seconds")
     return None
 
 
-def download_images(result: dict, prefix: str = "generated") -> list[Path]:
-    """Download generated images to the output directory."""
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+def _download_one(session: requests.Session, url: str, filepath: Path) -> Path:
+    """Stream a single image URL to disk."""
+    with session.get(url, stream=True, timeout=30) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+        size = resp.headers.get("Content-Length")
+
+        with filepath.open("wb") as fp:
+            # Pre-size the file as a hint to the filesystem
+            if size and size.isdigit():
+                fp.truncate(int(size))
+            shutil.copyfileobj(resp.raw, fp, length=DOWNLOAD_BUFFER_SIZE)
+            # Decoded content may be shorter than the advertised length
+            fp.truncate()
+
+    return filepath
+
+
+def _cache_key(url: str) -> str:
+    """Content-address a (stable) CDN URL."""
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
+def _load_cache_index() -> dict:
+    """Load the URL -> cached file index, ignoring a missing or corrupt file."""
+    try:
+        return json.loads(CACHE_INDEX.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+# Guards read-modify-write of the cache index across concurrent downloads
+_cache_lock = threading.Lock()
+
+
+def _update_cache_index(entries: dict):
+    """Merge new URL -> cached file entries into the persisted index."""
+    with _cache_lock:
+        index = _load_cache_index()
+        index.update(entries)
+        CACHE_INDEX.write_text(json.dumps(index, indent=2))
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hard-link ``dst`` to ``src`` so cached images aren't stored twice."""
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _fetch_cached(
+    session: requests.Session, url: str, filepath: Path, entry: Optional[list]
+) -> tuple[Path, list, bool]:
+    """Copy ``url`` to ``filepath``, downloading only on a cache miss.
+
+    Returns the file path, its updated cache entry and whether it was a hit.
+    """
+    key = _cache_key(url)
+    cache_path = CACHE_DIR / f"{key}.png"
+    cached_size = cache_path.stat().st_size if cache_path.exists() else None
 
+    # Known URL with an intact cached file: no network round-trip at all
+    hit = entry is not None and entry == [key, cached_size]
+
+    if not hit and cached_size is not None:
+        head = session.head(url, timeout=10, allow_redirects=True)
+        hit = head.ok and head.headers.get("Content-Length") == str(cached_size)
+
+    if not hit:
+        # Download beside the cache file so an interrupted transfer never
+        # leaves a truncated entry behind; the name is per thread so
+        # concurrent downloads of the same URL don't share a partial file
+        partial = CACHE_DIR / f"{key}.{threading.get_ident()}.part"
+        try:
+            _download_one(session, url, partial)
+            partial.replace(cache_path)
+        finally:
+            partial.unlink(missing_ok=True)
+        cached_size = cache_path.stat().st_size
+
+    _link_or_copy(cache_path, filepath)
+    return filepath, [key, cached_size], hit
+
+
+def get_image_urls(result: dict) -> list[str]:
+    """Extract image URLs from a completed task result."""
     image_urls = result.get("image_urls", [])
     if not image_urls:
         # Try single image URL
@@ -275,6 +615,19 @@ def download_images(result: dict, prefix: str = "generated") -> list[Path]:
         if single_url:
             image_urls = [single_url]
 
+    return image_urls
+
+
+def download_images(result: dict, prefix: str = "generated") -> list[Path]:
+    """Download generated images to the output directory."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    image_urls = get_image_urls(result)
     if not image_urls:
         print("No images found in result")
         return []
@@ -282,56 +635,432 @@ def download_images(result: dict, prefix: str = "generated") -> list[Path]:
     downloaded = []
     timestamp = int(time.time())
 
-    for i, url in enumerate(image_urls):
-        filename = f"{prefix}_{timestamp}_{i + 1}.png"
-        filepath = OUTPUT_DIR / filename
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+    cache_index = _load_cache_index()
+    new_entries = {}
+
+    with session, ThreadPoolExecutor(max_workers=min(8, len(image_urls))) as pool:
+        futures = {}
+        for i, url in enumerate(image_urls):
+            filename = f"{prefix}_{timestamp}_{i + 1}.png"
+            filepath = OUTPUT_DIR / filename
+
+            print(f"Downloading: {filename}")
+            future = pool.submit(
+                _fetch_cached, session, url, filepath, cache_index.get(url)
+            )
+            futures[future] = url
+
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                filepath, entry, hit = future.result()
+            except requests.RequestException as e:
+                print(f"Error: Failed to download {url}: {e}")
+                continue
+
+            if hit:
+                print(f"  {filepath.name}: reused cached copy")
+            new_entries[url] = entry
+            downloaded.append(filepath)
+
+    _update_cache_index(new_entries)
+    return sorted(downloaded)
+
+
+# =============================================================================
+# BATCH GENERATION
+# Submits several templates at once and polls them concurrently
+# =============================================================================
+
+
+async def _async_post(
+    session,
+    path: str,
+    payload: dict,
+    max_retries: int = 3,
+    idempotent: bool = True,
+):
+    """POST to the API, retrying transient failures. Returns (status, body).
+
+    See _request_with_retry for what ``idempotent=False`` retries.
+    """
+    import asyncio
+
+    import aiohttp
+
+    url = f"{APIFRAME_BASE_URL}/{path}"
+    if idempotent:
+        retryable_errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+        retryable_codes = RETRYABLE_STATUS_CODES
+    else:
+        # Failed to connect, so nothing was sent
+        retryable_errors = (aiohttp.ClientConnectorError,)
+        retryable_codes = RESUBMITTABLE_STATUS_CODES
+
+    for attempt in range(max_retries):
+        last_attempt = attempt == max_retries - 1
+        retry_after = None
+
+        try:
+            # Auth is per request so image downloads never carry the API key
+            request = session.post(url, json=payload, headers=get_headers())
+            async with request as resp:
+                if resp.status not in retryable_codes or last_attempt:
+                    if resp.status != 200:
+                        return resp.status, {"message": await resp.text()}
+                    return resp.status, await resp.json(content_type=None)
+                retry_after = resp.headers.get("Retry-After")
+        except retryable_errors:
+            if last_attempt:
+                raise
+
+        await asyncio.sleep(_retry_delay(retry_after, attempt))
+
+
+async def run_one(
+    session, name: str, prompt: str, aspect_ratio: str, args
+) -> Optional[list[Path]]:
+    """Submit, poll and download a single template within a batch."""
+    import asyncio
+
+    import aiohttp
+
+    payload = {"prompt": prompt, "aspect_ratio": aspect_ratio}
+
+    try:
+        status, data = await _async_post(
+            session, "imagine", payload, idempotent=False
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        print(f"[{name}] Error: Request to APIframe failed: {e}")
+        return None
+
+    task_id = data.get("task_id")
+    if status != 200 or not task_id:
+        print(f"[{name}] Error: Submit failed ({status}): {data}")
+        return None
+
+    print(f"[{name}] Task submitted: {task_id}")
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    n = 0
+    result = None
+
+    while loop.time() - start_time < args.timeout:
+        try:
+            code, result = await _async_post(session, "fetch", {"task_id": task_id})
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            code, result = None, {"message": str(e)}
+
+        if code != 200:
+            result = {"status": "error", **result}
+
+        status = result.get("status", "unknown")
+        percentage = result.get("percentage", "0")
+
+        if status in ("completed", "finished"):
+            break
+
+        if status == "failed" or status == "error":
+            print(f"[{name}] Generation failed: {result}")
+            return None
+
+        print(f"[{name}] Status: {status} ({percentage}%)")
+        remaining = args.timeout - (loop.time() - start_time)
+        await asyncio.sleep(max(0.0, min(poll_interval(n, percentage), remaining)))
+        n += 1
+    else:
+        print(f"[{name}] Timeout after {args.timeout} seconds")
+        return None
+
+    image_urls = get_image_urls(result)
+    print(f"[{name}] Generated {len(image_urls)} image(s)")
+    for url in image_urls:
+        print(f"  {url}")
+
+    if args.no_download or not image_urls:
+        return []
+
+    # Same cached, pooled download path as single-template runs
+    prefix = f"{args.output_prefix}_{name}" if args.output_prefix else name
+    return await asyncio.to_thread(download_images, result, prefix)
 
-        print(f"Downloading: {filename}")
-        urlretrieve(url, filepath)
-        downloaded.append(filepath)
 
-    return downloaded
+async def run_batch(jobs: list[tuple[str, str, str]], args) -> list:
+    """Run (name, prompt, aspect_ratio) jobs concurrently over one session."""
+    import asyncio
+
+    import aiohttp
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    connector = aiohttp.TCPConnector(limit=16)
+    timeout = aiohttp.ClientTimeout(connect=API_TIMEOUT[0], sock_read=API_TIMEOUT[1])
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(
+            *[run_one(session, *job, args) for job in jobs]
+        )
 
 
-def build_prompt(template_name: str, **kwargs) -> tuple[str, str]:
-    """Build a prompt from a template."""
-    if template_name not in TEMPLATES:
+def generate_batch(templates: list[str], args):
+    """Generate several templates concurrently and report the results."""
+    import asyncio
+
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        print("Error: --batch requires aiohttp")
+        print("Install it with: pip install -r requirements.txt")
+        sys.exit(1)
+
+    # Validate every template up front so a typo doesn't abort a running batch
+    jobs = []
+    for name in templates:
+        if name in ("custom", "raw"):
+            print(f"Error: '{name}' can't be used with --batch, only preset templates")
+            sys.exit(1)
+        prompt, aspect_ratio = build_prompt(
+            name, feature=args.feature, mode=args.mode
+        )
+        prompt = apply_image_references(prompt, args)
+        jobs.append((name, prompt, aspect_ratio))
+
+    print(f"\nSubmitting {len(jobs)} templates to Midjourney...")
+    results = asyncio.run(run_batch(jobs, args))
+
+    failed = [name for (name, _, _), res in zip(jobs, results) if res is None]
+    downloaded = [path for res in results if res for path in res]
+
+    if downloaded:
+        print(f"\nDownloaded to: {OUTPUT_DIR}")
+        for path in downloaded:
+            print(f"  {path.name}")
+
+    if failed:
+        print(f"\nFailed to generate: {', '.join(failed)}")
+        sys.exit(1)
+
+
+# =============================================================================
+# WEBHOOK DELIVERY
+# With --webhook, APIframe POSTs results instead of us polling /fetch
+# =============================================================================
+
+# Serializes downloads of delivered results across webhook handler threads
+_delivery_lock = threading.Lock()
+
+
+def _pending_path(task_id: str) -> Path:
+    """Journal file for a task (task ids are hashed to keep names safe)."""
+    return PENDING_DIR / f"{hashlib.sha1(task_id.encode()).hexdigest()[:16]}.json"
+
+
+def _read_pending(path: Path) -> Optional[dict]:
+    """Read one journal entry, ignoring a missing or corrupt file."""
+    try:
+        entry = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _load_pending() -> dict:
+    """Load all pending tasks as task_id -> prefix."""
+    pending = {}
+    for path in PENDING_DIR.glob("*.json"):
+        entry = _read_pending(path)
+        if entry:
+            pending[entry["task_id"]] = entry["prefix"]
+    return pending
+
+
+def _get_pending(task_id: str) -> Optional[str]:
+    """Return the prefix for a pending task, or None if it isn't journaled."""
+    entry = _read_pending(_pending_path(task_id))
+    return entry["prefix"] if entry else None
+
+
+def record_pending(task_id: str, prefix: str):
+    """Remember a webhook task so its images can be downloaded on delivery."""
+    PENDING_DIR.mkdir(parents=True, exist_ok=True)
+    path = _pending_path(task_id)
+
+    # Write then rename so readers never see a partially written entry
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps({"task_id": task_id, "prefix": prefix}))
+    os.replace(tmp, path)
+
+
+def _pop_pending(task_id: str) -> Optional[str]:
+    """Remove a task from the journal, returning its prefix if it was there."""
+    path = _pending_path(task_id)
+    prefix = _get_pending(task_id)
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        return None  # Already removed, possibly by another process
+    return prefix
+
+
+def handle_result(result: dict) -> bool:
+    """Download a delivered task result. Returns True once the task is done.
+
+    A task stays in the journal until all of its images are on disk or the
+    API reports it failed, so it can always be collected later with --drain.
+    """
+    task_id = result.get("task_id")
+    status = result.get("status", "unknown")
+
+    if not isinstance(task_id, str):
+        print(f"Ignoring result without a task_id: {result}")
+        return True
+
+    if status in ("completed", "finished"):
+        with _delivery_lock:
+            prefix = _get_pending(task_id)
+            if prefix is None:
+                print(f"Ignoring result for unknown task: {task_id}")
+                return True
+
+            try:
+                downloaded = download_images(result, prefix=prefix)
+            except OSError as e:
+                print(f"Task {task_id}: download failed, kept for --drain: {e}")
+                return False
+
+            print(f"Task {task_id}: downloaded {len(downloaded)} image(s)")
+            for path in downloaded:
+                print(f"  {path.name}")
+
+            if len(downloaded) < len(get_image_urls(result)):
+                print(f"Task {task_id}: some images missing, kept for --drain")
+                return False
+
+            _pop_pending(task_id)
+            return True
+
+    if status == "failed":
+        _pop_pending(task_id)
+        print(f"Task {task_id}: generation failed: {result}")
+        return True
+
+    if status == "error":
+        # Transport or API error fetching the task, not a failed generation
+        print(f"Task {task_id}: could not fetch result, kept for --drain: {result}")
+        return False
+
+    # Progress update, wait for the final delivery
+    return False
+
+
+def serve_webhooks(port: int):
+    """Run a local webhook receiver until interrupted."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+        """Receive APIframe task results POSTed to the webhook URL."""
+
+        def do_POST(self):
+            # Reachable through a public tunnel, so reject malformed input
+            # before acknowledging it
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                result = json.loads(self.rfile.read(length))
+            except ValueError:
+                self.send_error(400, "Invalid JSON")
+                return
+
+            if not isinstance(result, dict):
+                self.send_error(400, "Expected a JSON object")
+                return
+
+            # Acknowledge with an explicit empty body so the client is done
+            # before we start downloading and APIframe doesn't time out
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            self.wfile.flush()
+            handle_result(result)
+
+        def log_message(self, format, *args):
+            pass  # Keep output to task progress only
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), WebhookHandler)
+    print(f"Listening for APIframe webhooks on http://127.0.0.1:{port}/")
+    print("Expose it with a tunnel and pass that URL to --webhook. Ctrl-C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def drain_pending():
+    """Fetch each journaled task once and download any that have finished."""
+    pending = _load_pending()
+    if not pending:
+        print("No pending webhook tasks")
+        return
+
+    waiting = 0
+    for task_id in pending:
+        result = fetch_result(task_id)
+        result.setdefault("task_id", task_id)
+        if not handle_result(result):
+            waiting += 1
+
+    if waiting:
+        print(f"{waiting} task(s) still pending, run --drain again later")
+
+
+@functools.lru_cache(maxsize=64)
+def build_prompt(
+    template_name: str,
+    feature: Optional[str] = None,
+    mode: str = "human-human",
+) -> tuple[str, str]:
+    """Build a normalized prompt from a template."""
+    entry = _TEMPLATE_INDEX.get(template_name)
+    if entry is None:
         print(f"Error: Unknown template '{template_name}'")
         print(f"Available templates: {', '.join(TEMPLATES.keys())}")
         sys.exit(1)
 
-    template = TEMPLATES[template_name]
+    aspect_ratio, required, variants, parts = entry
 
     # Check required parameters
-    required = template.get("requires", [])
+    kwargs = {"feature": feature, "mode": mode}
     for req in required:
-        if req not in kwargs or not kwargs[req]:
+        if not kwargs.get(req):
             print(f"Error: Template '{template_name}' requires --{req}")
             sys.exit(1)
 
     # Handle variant templates (like interview-banner)
-    if "variants" in template:
-        mode = kwargs.get("mode", "human-human")
-        if mode not in template["variants"]:
+    if variants is not None:
+        parts = variants.get(mode)
+        if parts is None:
             print(f"Error: Unknown mode '{mode}'")
-            print(f"Available modes: {', '.join(template['variants'].keys())}")
+            print(f"Available modes: {', '.join(variants.keys())}")
             sys.exit(1)
-        prompt = template["variants"][mode]
-    else:
-        prompt = template["prompt"]
 
-    # Replace placeholders
-    if "[FEATURE]" in prompt:
-        feature = kwargs.get("feature", "Developer Tools")
-        prompt = prompt.replace("[FEATURE]", feature)
+    # Fill the [FEATURE] placeholder
+    prefix, suffix = parts
+    if suffix is None:
+        return prefix, aspect_ratio
 
-    return prompt, template["aspect_ratio"]
+    return prefix + (feature or "Developer Tools") + suffix, aspect_ratio
 
 
 def apply_art_direction(prompt: str) -> str:
     """Apply art direction style to a custom prompt if not already styled."""
     # Check if already has style flags
-    if "--style" in prompt.lower():
+    if _STYLE_FLAG_RE.search(prompt):
         return prompt
 
     # Add art direction elements
@@ -389,6 +1118,9 @@ Examples:
   %(prog)s interview-banner --mode bot-human
   %(prog)s custom --prompt "a calm workspace" --ar 16:9
   %(prog)s raw --prompt "exact prompt --ar 1:1 --v 6"
+  %(prog)s --batch hero-banner,og-card,twitter-card
+  %(prog)s hero-banner --webhook https://example.com/hook
+  %(prog)s --serve 8080
   %(prog)s --list
         """,
     )
@@ -437,6 +1169,27 @@ Examples:
     parser.add_argument(
         "--list", "-l", action="store_true", help="List available templates"
     )
+    parser.add_argument(
+        "--webhook",
+        metavar="URL",
+        help="Have APIframe POST the result to URL instead of polling",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help="Run a local webhook receiver that downloads delivered results",
+    )
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Download any finished tasks submitted with --webhook",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="TEMPLATE[,TEMPLATE...]",
+        help="Generate several templates concurrently (comma-separated)",
+    )
 
     # Image reference arguments
     parser.add_argument(
@@ -476,6 +1229,27 @@ Examples:
         list_templates()
         return
 
+    if args.serve:
+        serve_webhooks(args.serve)
+        return
+
+    if args.drain:
+        drain_pending()
+        return
+
+    if args.batch:
+        if args.webhook:
+            print("Error: --webhook cannot be combined with --batch")
+            sys.exit(1)
+        templates = [t.strip() for t in args.batch.split(",") if t.strip()]
+        if args.template:
+            templates.insert(0, args.template)
+        # Drop repeats (keeping order) so a template isn't billed twice and
+        # its downloads don't overwrite each other
+        templates = list(dict.fromkeys(templates))
+        generate_batch(templates, args)
+        return
+
     if not args.template:
         parser.print_help()
         print("\n")
@@ -504,7 +1278,15 @@ Examples:
     prompt = apply_image_references(prompt, args)
 
     # Submit and wait
-    task_id = submit_imagine(prompt, aspect_ratio)
+    task_id = submit_imagine(prompt, aspect_ratio, webhook_url=args.webhook)
+
+    if args.webhook:
+        prefix = args.output_prefix or args.template or "generated"
+        record_pending(task_id, prefix)
+        print(f"\nResult will be delivered to {args.webhook}")
+        print("Run with --serve PORT to receive it, or --drain to collect later")
+        return
+
     result = poll_for_completion(task_id, timeout=args.timeout)
 
     if not result:
@@ -512,11 +1294,7 @@ Examples:
         sys.exit(1)
 
     # Output results
-    image_urls = result.get("image_urls", [])
-    if not image_urls:
-        single_url = result.get("original_image_url")
-        if single_url:
-            image_urls = [single_url]
+    image_urls = get_image_urls(result)
 
     print(f"\nGenerated {len(image_urls)} image(s):")
     for url in image_urls: